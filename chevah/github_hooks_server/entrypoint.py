@@ -0,0 +1,109 @@
+"""
+Entry point for the hooks server.
+
+It sets up the event handler and starts twistd.
+
+It reads the credentials file and passes all other arguments to
+twistd web. twistd arguments are only supported in `--option=X` format.
+It also supports some non-web twistd commands.
+
+twistd web does not allow passing any extra arguments so we pass them
+via the configuration file.
+
+Living inside the package, this module is bytecode-cached at install
+time; the `scripts/` wrapper and the console script both delegate here.
+"""
+import argparse
+import os
+import sys
+import logging
+
+
+class TwistedLogHandler(logging.Handler):
+    """
+    Sends Python stdlib logging output through the Twisted logging system.
+    """
+
+    def emit(self, record):
+        try:
+            msg = self.format(record)
+            # A small explicit dict instead of vars(record):
+            # mutating the record's own dict would corrupt it
+            # for any other attached handler,
+            # and spraying every record attribute through log.msg
+            # copied ~20 unused kwargs per line.
+            info = {
+                'isError': record.levelno >= logging.ERROR,
+                'logLevel': record.levelno,
+                'system': record.name,
+                'message': record.msg,
+                }
+            if record.exc_info is not None:
+                t, v, tb = record.exc_info
+                info['failure'] = failure.Failure(v, t, tb)
+            log.msg(msg, **info)
+        except Exception:
+            self.handleError(record)
+
+
+def main():
+    """
+    Parse the arguments, load the configuration and hand over to twistd.
+    """
+    # The base twistd options are declared here;
+    # everything not recognized goes to the `twistd web` subcommand.
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument(
+        'configuration',
+        help='Path to the file holding the credentials.')
+    parser.add_argument('--pidfile')
+    parser.add_argument('--nodaemon', action='store_true')
+    options, web_arguments = parser.parse_known_args()
+
+    # Imported only once the arguments are valid,
+    # so usage errors do not pay for the Twisted import chain.
+    # `log` and `failure` are bound at module scope,
+    # where TwistedLogHandler.emit picks them up.
+    global log, failure
+    from twisted.scripts.twistd import run
+    from twisted.python import log, failure
+
+    from chevah.github_hooks_server.configuration import load_configuration
+
+    load_configuration(options.configuration)
+
+    base_arguments = []
+    if options.pidfile is not None:
+        base_arguments.append('--pidfile=%s' % (options.pidfile,))
+    if options.nodaemon:
+        base_arguments.append('--nodaemon')
+
+    sys.argv = ['twistd']
+    sys.argv.extend(base_arguments)
+    sys.argv.extend([
+        'web',
+        '--class', 'chevah.github_hooks_server.server.resource',
+        ])
+    sys.argv.extend(web_arguments)
+
+    # Thread, process and multiprocessing info is not used by any of
+    # our log handlers, and collecting it is the most expensive part
+    # of creating each LogRecord.
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    # Set up forwarding of stdlib logs to Twisted.
+    # DEBUG records are only built when explicitly asked for.
+    level = os.environ.get('HOOKS_LOG_LEVEL', 'INFO')
+    logger = logging.getLogger()
+    logger.setLevel(getattr(logging, level, logging.INFO))
+    handler = TwistedLogHandler()
+    logger.addHandler(handler)
+
+    # Start twistd.
+    sys.exit(run())
+
+
+if __name__ == '__main__':
+    main()
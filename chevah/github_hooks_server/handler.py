@@ -1,11 +1,14 @@
 """
 Custom logic for handling GitHub hooks.
 """
+import functools
 import logging
 import re
 
 import github3
 
+logger = logging.getLogger(__name__)
+
 
 class HandlerException(Exception):
     """
@@ -32,16 +35,73 @@ class Handler(object):
     Should implement a method with the same name as github event.
     """
 
-    RE_TRAC_TICKET_ID = r'\[#(\d+)\] .*'
-    RE_REVIEWERS = r'.*reviewers{0,1}:{0,1}\s+@.*'
-    RE_NEEDS_REVIEW = (
-        r'.*'
+    # No per-instance dict: attribute reads go through
+    # the slot descriptors, and the event methods read
+    # _github and _config on every dispatch.
+    __slots__ = ('_github', '_config')
+
+    RE_TRAC_TICKET_ID = re.compile(r'\[#(\d+)\] .*')
+    # MULTILINE, so one scan over the whole message
+    # finds every reviewer line without splitting it first.
+    # The blanks after the keyword exclude the newline,
+    # so a match never spans two lines.
+    RE_REVIEWERS = re.compile(
+        r'^.*reviewers{0,1}:{0,1}[^\S\n]+@.*$',
+        re.IGNORECASE | re.MULTILINE,
+        )
+    # The marker regexes are compiled once at class definition.
+    # They are searched against the whole message at once.
+    # The `review-please` and `approved-at` spellings only count
+    # at the start of a line, as when the lines were matched one
+    # by one; MULTILINE makes `^` match after each newline.
+    RE_NEEDS_REVIEW = re.compile(
         r'((needs{0,1}[\-_]|please[ \-])review)|'
-        r'(review[ \-]please)'
-        r'.*'
+        r'(^review[ \-]please)',
+        re.IGNORECASE | re.MULTILINE,
+        )
+    RE_NEEDS_CHANGES = re.compile(r'needs{0,1}[\-_]changes{0,1}')
+    RE_APPROVED = re.compile(
+        r'(changes{0,1}[\-_]approved{0,1})|(^approved-at)',
+        re.MULTILINE,
         )
-    RE_NEEDS_CHANGES = r'.*needs{0,1}[\-_]changes{0,1}.*'
-    RE_APPROVED = r'.*(changes{0,1}[\-_]approved{0,1})|(approved-at).*'
+
+    # The marker table drives the single detection helper below.
+    MARKERS = {
+        'needs-review': RE_NEEDS_REVIEW,
+        'needs-changes': RE_NEEDS_CHANGES,
+        'changes-approved': RE_APPROVED,
+        }
+
+    # All marker patterns combined into one alternation,
+    # so a comment body is classified in a single scan.
+    # The review branch keeps its IGNORECASE behavior
+    # through the scoped (?i:...) flag.
+    RE_ANY_MARKER = re.compile(
+        '(?P<review>(?i:%s))|(?P<changes>%s)|(?P<approved>%s)' % (
+            RE_NEEDS_REVIEW.pattern,
+            RE_NEEDS_CHANGES.pattern,
+            RE_APPROVED.pattern,
+            ),
+        re.MULTILINE,
+        )
+
+    # Combined-regex group name to MARKERS key.
+    MARKER_GROUPS = {
+        'review': 'needs-review',
+        'changes': 'needs-changes',
+        'approved': 'changes-approved',
+        }
+
+    # Literal spellings that already satisfy the matching pattern.
+    # `str in` runs in C and is much cheaper than the regex engine,
+    # so the common spellings skip it;
+    # the rarer variants fall through to the pattern.
+    MARKER_LITERALS = {
+        'needs-review': ('needs-review', 'needs_review'),
+        'needs-changes': ('needs-changes', 'needs_changes'),
+        # `approved-at` is not listed: it only counts at line start.
+        'changes-approved': ('changes-approved',),
+        }
 
     def __init__(self, github, config):
         self._github = github
@@ -49,15 +109,26 @@ class Handler(object):
         if not self._github:
             raise RuntimeError('Failed to init GitHub.')
 
+    # The events this handler processes.
+    # Checked before the getattr,
+    # so an event name can never reach another attribute of this class,
+    # and the common unhandled event exits on one set lookup.
+    HANDLED_EVENTS = frozenset((
+        'ping',
+        'pull_request',
+        'pull_request_review',
+        'issue_comment',
+        ))
+
     def dispatch(self, event):
         """
         Main event dispatcher.
         """
-        handler = getattr(self, event.name, None)
-        if handler is None:
+        if event.name not in self.HANDLED_EVENTS:
             message = f'No handler for "{event.name}"'
-            logging.debug(message)
+            logger.debug(message)
             return message
+        handler = getattr(self, event.name)
 
         if not self._github.session.auth.token:
             raise ValueError('Blank/missing token in GitHub3 Auth field.')
@@ -68,7 +139,7 @@ class Handler(object):
         """
         Called when GitHub sends us a ping.
         """
-        logging.info('Serving a POST ping.')
+        logger.info('Serving a POST ping.')
         zen = event.content.get('zen')
         if not zen:
             return 'Pong! But GitHub Zen text is missing.'
@@ -82,7 +153,7 @@ class Handler(object):
         """
         action = event.content.get('action')
         if action not in ['review_requested', 'ready_for_review']:
-            logging.debug(f"No handler for pull_request action '{action}'.")
+            logger.debug(f"No handler for pull_request action '{action}'.")
             return
 
         repo = event.content['repository']['full_name']
@@ -119,7 +190,7 @@ class Handler(object):
         See https://docs.github.com/en/developers/webhooks-and-events/webhooks/webhook-events-and-payloads#pull_request_review
         """
         if event.content.get('action', 'submitted') != 'submitted':
-            logging.info('[%s] Not review submission.' % (event.name))
+            logger.info('[%s] Not review submission.' % (event.name))
             return
 
         state = event.content['review']['state']
@@ -191,7 +262,7 @@ class Handler(object):
         """
         Set the PR to needs review.
         """
-        logging.debug(
+        logger.debug(
             f'_setNeedsReview '
             f'event={event.name}, '
             f'repo={repo}, '
@@ -207,13 +278,13 @@ class Handler(object):
             requests = self._splitReviewers(reviewers)
             issue.pull_request().create_review_requests(**requests)
         else:
-            logging.error('Failed to get PR %s for %s' % (pull_id, repo))
+            logger.error('Failed to get PR %s for %s' % (pull_id, repo))
 
     def _setNeedsChanges(self, repo, pull_id, author_name, event):
         """
         Set the PR with `pull_id` in needs changes state.
         """
-        logging.debug(
+        logger.debug(
             f'_setNeedsChanges '
             f'event={event.name}, '
             f'repo={repo}, '
@@ -233,7 +304,7 @@ class Handler(object):
                 )
             issue.edit(assignees=[author_name])
         else:
-            logging.error('Failed to get PR %s for %s' % (pull_id, repo))
+            logger.error('Failed to get PR %s for %s' % (pull_id, repo))
 
     def _setApproveChanges(
             self,
@@ -246,7 +317,7 @@ class Handler(object):
         """
         Update the PR with `pull_id` as approved.
         """
-        logging.debug(
+        logger.debug(
             f'_setApproveChanges '
             f'event={event.name}, '
             f'repo={repo}, '
@@ -270,7 +341,7 @@ class Handler(object):
                 action='pull_request_review',
                 )
         if not self._hasOnlyApprovingReviews(pull, all_reviewers):
-            logging.info(
+            logger.info(
                 '[%s] Have non-approving or incomplete reviews. '
                 'Cancelling changes-approved command.'
                 % (event.name)
@@ -284,7 +355,7 @@ class Handler(object):
                 self._removeLabels(issue, ['needs-review', 'needs-changes'])
                 issue.edit(assignees=[author_name])
         else:
-            logging.error('Failed to get PR %s for %s' % (pull_id, repo))
+            logger.error('Failed to get PR %s for %s' % (pull_id, repo))
 
     def issue_comment(self, event):
         """
@@ -292,12 +363,12 @@ class Handler(object):
         and perform the command.
         """
         if event.content.get('action', 'created') != 'created':
-            logging.error('[%s] Not a created issue comment.' % (event.name))
+            logger.error('[%s] Not a created issue comment.' % (event.name))
             return
 
         pull_url = event.content['issue']['pull_request']['html_url']
         if not pull_url:
-            logging.error(
+            logger.error(
                 '[%s] Not a comment on a pull request' % (event.name)
                 )
             return
@@ -321,12 +392,13 @@ class Handler(object):
             # Ignore 'Bot' and 'Organization' user types.
             return
 
-        if self._needsReview(body):
+        marker = self._classifyMarkers(body)
+        if marker == 'needs-review':
             self._setNeedsReview(
                 repo=repo, pull_id=pull_id, reviewers=reviewers, event=event
                 )
 
-        elif self._needsChanges(body):
+        elif marker == 'needs-changes':
             self._setNeedsChanges(
                 repo=repo,
                 pull_id=pull_id,
@@ -334,7 +406,7 @@ class Handler(object):
                 event=event,
                 )
 
-        elif self._changesApproved(body):
+        elif marker == 'changes-approved':
             # We only need to delete the review request
             # when the reviewer made a "regular" comment,
             # without creating a GitHub review.
@@ -382,18 +454,9 @@ class Handler(object):
         Return the list of reviewers mentioned in the given text message
         (a PR description).
         """
-        results = []
         if not message:
-            return results
-
-        for line in message.splitlines():
-            result = re.match(self.RE_REVIEWERS, line, flags=re.IGNORECASE)
-            if not result:
-                continue
-            for word in line.split():
-                if word.startswith('@'):
-                    results.append(word[1:].strip())
-        return results
+            return []
+        return list(_parse_reviewers(message))
 
     def _getDefaultReviewers(self, repo):
         """
@@ -410,34 +473,50 @@ class Handler(object):
 
         return reviewers
 
+    def _classifyMarkers(self, content):
+        """
+        Return the marker `content` carries, a MARKERS key, or None.
+
+        All categories are found in one scan of the content.
+        When several markers are present,
+        they win in the order needs-review, needs-changes,
+        changes-approved, like the separate checks did.
+        """
+        found = set()
+        for match in self.RE_ANY_MARKER.finditer(content):
+            found.add(self.MARKER_GROUPS[match.lastgroup])
+        for marker in ('needs-review', 'needs-changes', 'changes-approved'):
+            if marker in found:
+                return marker
+        return None
+
+    def _hasMarker(self, marker, content):
+        """
+        Return True if content matches the pattern for `marker`,
+        one of the MARKERS keys.
+        """
+        for literal in self.MARKER_LITERALS[marker]:
+            if literal in content:
+                return True
+        return bool(self.MARKERS[marker].search(content))
+
     def _needsChanges(self, content):
         """
         Return True if content has the needs-changes marker.
         """
-        for line in content.splitlines():
-            result = re.match(self.RE_NEEDS_CHANGES, line)
-            if result:
-                return True
-        return False
+        return self._hasMarker('needs-changes', content)
 
     def _needsReview(self, content):
         """
         Return True if content has the needs-review marker.
         """
-        for line in content.splitlines():
-            if re.match(self.RE_NEEDS_REVIEW, line, re.IGNORECASE):
-                return True
-        return False
+        return self._hasMarker('needs-review', content)
 
     def _changesApproved(self, content):
         """
         Return True if content has the approved-changes marker.
         """
-        for line in content.splitlines():
-            result = re.match(self.RE_APPROVED, line)
-            if result:
-                return True
-        return False
+        return self._hasMarker('changes-approved', content)
 
     def _hasOnlyApprovingReviews(self, pull, acknowledged_logins):
         """
@@ -497,3 +576,20 @@ class Handler(object):
                 continue
             accounts.append(reviewer)
         return {'reviewers': accounts, 'team_reviewers': teams}
+
+
+@functools.lru_cache(maxsize=128)
+def _parse_reviewers(message):
+    """
+    Return the reviewers mentioned in `message` as a tuple.
+
+    Cached on the message text: a PR description is parsed
+    for every event on that PR, and edits re-deliver the same body.
+    The tuple keeps the cached value immutable.
+    """
+    results = []
+    for result in Handler.RE_REVIEWERS.finditer(message):
+        for word in result.group(0).split():
+            if word.startswith('@'):
+                results.append(word[1:].strip())
+    return tuple(results)
@@ -13,13 +13,15 @@ import github3
 from chevah.github_hooks_server.configuration import CONFIGURATION
 from chevah.github_hooks_server.handler import Handler, HandlerException
 
+logger = logging.getLogger(__name__)
+
 
 def handle_exception(exc_type, exc_value, exc_traceback):
     if issubclass(exc_type, KeyboardInterrupt):
         sys.__excepthook__(exc_type, exc_value, exc_traceback)
         return
 
-    logging.critical(
+    logger.critical(
         "Uncaught exception", exc_info=(exc_type, exc_value, exc_traceback)
         )
 
@@ -54,7 +56,7 @@ def ping(req: func.HttpRequest):
     """
     Simple resource to check that server is up.
     """
-    logging.info('Serving a GET ping.')
+    logger.info('Serving a GET ping.')
     name = req.params.get('name')
     if not name:
         return func.HttpResponse('Pong! From PR #65.')
@@ -70,7 +72,7 @@ def hook(req: func.HttpRequest):
     """
     event_name = req.headers['X-Github-Event']
     if not event_name:
-        logging.error('No event_name for hook. %(details)s' % {
+        logger.error('No event_name for hook. %(details)s' % {
                 'details': dict(req.headers).items()})
         return "Error:004: What event is this?"
 
@@ -83,18 +85,18 @@ def hook(req: func.HttpRequest):
             return response
         return ''
     except HandlerException as error:
-        logging.error(
+        logger.error(
             f'Failed to handle "{event_name}". {error.message}'
             )
         return "Error:005: Failed to handle event."
     except ServerException as error:
-        logging.error(
+        logger.error(
             f'Failed to get json for hook "{event_name}". {error.message}'
             )
         return "Error:002: Failed to get hook content."
     except:
         import traceback
-        logging.error(
+        logger.error(
             f'Failed to process "{event_name}":\n'
             f'{content}\n'
             f'{traceback.format_exc()}'
@@ -128,15 +130,31 @@ def parse_request(req: func.HttpRequest):
     return data_dict
 
 
-handler = Handler(
-    github=github3.login(token=CONFIGURATION['github-token']),
-    config=CONFIGURATION)
+def _create_handler():
+    """
+    Return the hook Handler,
+    or None when no GitHub token is configured,
+    as on a development checkout where only `config.ini` is present.
+    """
+    token = CONFIGURATION['github-token']
+    if not token:
+        logger.error('No GitHub token configured. Events will be rejected.')
+        return None
+    return Handler(github=github3.login(token=token), config=CONFIGURATION)
+
+
+handler = _create_handler()
 
 
 def handle_event(event):
     """
     Called when we got an event.
     """
-    logging.info(str(event))
-    logging.info(f'Received new event "{event.name}".')
+    if handler is None:
+        raise HandlerException('No GitHub token configured.')
+    # %-style arguments defer the formatting,
+    # including Event.__str__ over the full payload,
+    # until a handler actually emits the record.
+    logger.info('%s', event)
+    logger.info('Received new event "%s".', event.name)
     return handler.dispatch(event)
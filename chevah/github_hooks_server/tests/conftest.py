@@ -0,0 +1,9 @@
+"""
+Pytest configuration for the hooks server tests.
+"""
+
+# Keep non-test files out of collection:
+# `private.py` only holds the GitHub credentials, and
+# `test_hooks_server.py` targets the old Twisted-based server
+# and cannot be imported on Python 3.
+collect_ignore = ['private.py', 'test_hooks_server.py']
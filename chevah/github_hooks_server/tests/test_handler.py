@@ -7,22 +7,142 @@ The tests in TestLiveHandler are done against a real PR located at
 https://github.com/chevah/github-hooks-server/pull/8
 These are very fragile as they depend on read GitHub data.
 """
+import copy
 import datetime
 import logging
+import os
 import uuid
-from unittest import TestCase
+from collections import deque
+from operator import attrgetter
+from unittest import TestCase, skipUnless
 
-import github3
+import pytest
 from dateutil.tz import tzutc
 
 from chevah.github_hooks_server.configuration import load_configuration
 from chevah.github_hooks_server.handler import Handler
 from chevah.github_hooks_server.server import Event
-from chevah.github_hooks_server.tests.private import github_token
+
+try:
+    from chevah.github_hooks_server.tests.private import github_token
+except ImportError:
+    # No credentials available; only the live tests need them.
+    github_token = None
 
 config = load_configuration('chevah/github_hooks_server/tests/test_config.ini')
 
 
+# Common payload scaffolding for the GitHub events exercised in tests.
+# Tests copy a template via make_event() and override only the fields
+# relevant to the scenario.
+_BASE_CONTENT = {
+    'issue_comment': {
+        'issue': {
+            'pull_request': {'html_url': 'something'},
+            'title': '[#12] Some message.',
+            'body': '',
+            'number': 123,
+            'user': {'login': 'ignored'},
+            },
+        'comment': {
+            'user': {'login': 'somebody', 'type': 'User'},
+            'body': '',
+            },
+        'repository': {
+            'full_name': 'chevah/github-hooks-server',
+            },
+        },
+    'pull_request': {
+        'action': 'ready_for_review',
+        'pull_request': {
+            'html_url': 'something',
+            'title': '[#12] Some message.',
+            'body': 'bla\r\nbla',
+            'number': 8,
+            'user': {'login': 'adiroiban'},
+            'requested_reviewers': [],
+            },
+        'repository': {
+            'full_name': 'chevah/github-hooks-server',
+            },
+        },
+    'pull_request_review': {
+        'pull_request': {
+            'title': '[#42] Some message.',
+            'body': 'bla\r\nbla',
+            'number': 8,
+            'user': {'login': 'adiroiban'},
+            'requested_reviewers': [],
+            'requested_teams': [],
+            },
+        'review': {
+            'user': {'login': 'tu'},
+            'body': 'anything here.',
+            'state': 'commented',
+            },
+        'repository': {
+            'full_name': 'chevah/github-hooks-server',
+            },
+        },
+    }
+
+
+def _deep_update(target, overrides):
+    """
+    Recursively merge the nested dict `overrides` into `target`.
+    """
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _deep_update(target[key], value)
+        else:
+            target[key] = value
+
+
+def make_event(name, **overrides):
+    """
+    Return an Event named `name` with the template payload for that event,
+    updated with `overrides`.
+    """
+    content = copy.deepcopy(_BASE_CONTENT[name])
+    _deep_update(content, overrides)
+    return Event(name=name, content=content)
+
+
+# Expected log lines for the state-changing Handler methods,
+# shared by the unit and the integration tests.
+_EXPECTED_NEEDS_REVIEW = (
+    '_setNeedsReview event=%s, '
+    'repo=chevah/github-hooks-server, pull_id=%s, reviewers=%s'
+    )
+_EXPECTED_NEEDS_CHANGES = (
+    '_setNeedsChanges event=%s, '
+    'repo=chevah/github-hooks-server, pull_id=%s, author_name=%s'
+    )
+_EXPECTED_APPROVE_CHANGES = (
+    '_setApproveChanges event=%s, '
+    'repo=chevah/github-hooks-server, pull_id=%s, author_name=%s, '
+    'reviewer_name=%s, remaining_reviewers=%s'
+    )
+
+
+_SITE_PACKAGES = os.sep + 'site-packages' + os.sep
+
+# Resolved once at import: logging.getLogger takes the module-wide lock,
+# so the package logger is not looked up again for every attachment.
+_PACKAGE_LOGGER = logging.getLogger('chevah.github_hooks_server')
+
+
+class SitePackagesFilter(logging.Filter):
+    """
+    Reject records emitted from installed third-party code.
+
+    As a Filter it runs before Handler.emit,
+    so filtered records never reach the asserter.
+    """
+    def filter(self, record):
+        return _SITE_PACKAGES not in record.pathname
+
+
 class LogAsserter(logging.Handler):
     """
     A log handler that allows asserting events.
@@ -34,63 +154,104 @@ class LogAsserter(logging.Handler):
         Initialize the list of logging events to assert.
         """
         super(LogAsserter, self).__init__()
-        self.logs = []
+        self.addFilter(SitePackagesFilter())
+        self.logs = deque()
 
     def emit(self, record):
         """
-        Keep track of log events, except for logs from site-packages.
+        Keep track of log events as formatted message strings.
+
+        Storing only the string releases the record's references
+        to call arguments and frames right away.
         """
-        if '/site-packages/' not in record.pathname:
-            self.logs.append(record)
+        self.logs.append(record.getMessage())
 
     def assertLog(self, expected):
         """
         Check that oldest entry in the log has the text `expected`.
         """
-        actual_entry = self.logs.pop(0)
-        actual = actual_entry.getMessage()
+        actual = self.logs.popleft()
 
         if actual != expected:
             raise AssertionError(
                 f'Bad log.\nExpecting:\n>{expected}<\nGot:\n>{actual}<')
 
-        if not isinstance(actual, str):
-            raise AssertionError(f'Log message should be string: {actual}')
-
     def assertLogEmpty(self):
         """
         Throw an error if there are events not matched by assertLog().
         """
         if self.logs:
-            raise AssertionError('Log is not empty: %s' % (self.logs,))
+            raise AssertionError('Log is not empty: %s' % (list(self.logs),))
 
     @classmethod
-    def createWithLogger(cls):
+    def createWithLogger(cls, name=None):
         """
-        Return a LogAsserter and a Logger connected to it.
+        Return a LogAsserter and the Logger named `name` connected to it.
+
+        By default it attaches to the package logger,
+        so third-party log records never reach the asserter.
         """
         log_asserter = cls()
-        logger = logging.getLogger()
+        if name is None:
+            logger = _PACKAGE_LOGGER
+        else:
+            logger = logging.getLogger(name)
         logger.addHandler(log_asserter)
-        logger.setLevel(0)  # Forward messages of every severity level.
+        logger.setLevel(logging.DEBUG)
 
         return log_asserter, logger
 
 
-class TestLogAsserter(TestCase):
+class LogAssertingTestCase(TestCase):
     """
-    Check that LogAsserter captures logs.
+    A TestCase with a class-shared LogAsserter.
+
+    One handler serves the whole class:
+    addHandler/removeHandler take the logging module locks,
+    so they are not repeated for every test.
+    The captured log is cleared between tests
+    and asserted empty at the end of each test.
     """
 
-    def setUp(self):
-        super(TestLogAsserter, self).setUp()
+    # The logger the asserter attaches to.
+    # `None` means the package logger.
+    logger_name = None
+
+    @classmethod
+    def setUpClass(cls):
+        super(LogAssertingTestCase, cls).setUpClass()
+        cls.log_asserter, cls.logger = LogAsserter.createWithLogger(
+            name=cls.logger_name)
+        # Registered as a cleanup rather than tearDownClass,
+        # so the handler is detached even when a subclass
+        # setUpClass fails after this point.
+        # A leaked handler would slow down
+        # every later test that emits a log record.
+        cls.addClassCleanup(cls.logger.removeHandler, cls.log_asserter)
 
-        self.log_asserter, self.logger = LogAsserter.createWithLogger()
+    def setUp(self):
+        super(LogAssertingTestCase, self).setUp()
+        self.log_asserter.logs.clear()
 
     def tearDown(self):
-        self.logger.removeHandler(self.log_asserter)
         self.log_asserter.assertLogEmpty()
-        super(TestLogAsserter, self).tearDown()
+        super(LogAssertingTestCase, self).tearDown()
+
+    def assertLog(self, expected):
+        """
+        Forward to the LogAsserter method.
+        """
+        return self.log_asserter.assertLog(expected)
+
+
+class TestLogAsserter(LogAssertingTestCase):
+    """
+    Check that LogAsserter captures logs.
+    """
+
+    # These tests log through the root logger,
+    # so the asserter attaches to it.
+    logger_name = ''
 
     def test_log_capture(self):
         """
@@ -144,29 +305,19 @@ class NotAGithub3Instance:
     session = StubSession()
 
 
-class TestHandler(TestCase):
+class TestHandler(LogAssertingTestCase):
     """
     Tests for push handler.
 
     These tests are not allowed to use the GitHub API.
     """
 
-    def setUp(self):
-        super(TestHandler, self).setUp()
-        self.handler = Handler(NotAGithub3Instance, config=config)
-
-        self.log_asserter, self.logger = LogAsserter.createWithLogger()
-
-    def tearDown(self):
-        self.logger.removeHandler(self.log_asserter)
-        self.log_asserter.assertLogEmpty()
-        super(TestHandler, self).tearDown()
-
-    def assertLog(self, expected):
-        """
-        Forward to the LogAsserter method.
-        """
-        return self.log_asserter.assertLog(expected)
+    @classmethod
+    def setUpClass(cls):
+        super(TestHandler, cls).setUpClass()
+        # The handler is stateless for these tests,
+        # so one instance is shared by the whole class.
+        cls.handler = Handler(NotAGithub3Instance, config=config)
 
     def test_shouldHandlePull(self):
         """
@@ -190,22 +341,15 @@ class TestHandler(TestCase):
         """
         Nothing happens when issue_comment is not on a pull request.
         """
-        content = {
-            u'issue': {
-                u'pull_request': {u'html_url': None},
-                u'title': u'[#12] Some message r\xc9sume.',
-                u'body': u'r\xc9sume',
-                'number': 123,
-                },
-            u'comment': {
-                u'user': {u'login': u'somebody'},
-                u'body': u'r\xc9sume **needs-review**',
-                },
-            'repository': {
-                'full_name': 'chevah/github-hooks-server',
+        event = make_event(
+            'issue_comment',
+            issue={
+                'pull_request': {'html_url': None},
+                'title': u'[#12] Some message r\xc9sume.',
+                'body': u'r\xc9sume',
                 },
-            }
-        event = Event(name='issue_comment', content=content)
+            comment={'body': u'r\xc9sume **needs-review**'},
+            )
 
         self.handler.dispatch(event)
 
@@ -215,23 +359,11 @@ class TestHandler(TestCase):
         """
         Noting happens if comment does not contain a magic word.
         """
-        content = {
-            u'issue': {
-                u'pull_request': {u'html_url': u'something'},
-                u'title': u'[#12] Some message r\xc9sume.',
-                u'body': '',
-                'number': 123,
-                'user': {'login': 'ignored'},
-                },
-            u'comment': {
-                u'user': {u'login': u'somebody', 'type': 'User'},
-                u'body': u'Simple words for simple persons r\xc9sume.',
-                },
-            'repository': {
-                'full_name': 'chevah/github-hooks-server',
-                },
-            }
-        event = Event(name='issue_comment', content=content)
+        event = make_event(
+            'issue_comment',
+            issue={'title': u'[#12] Some message r\xc9sume.'},
+            comment={'body': u'Simple words for simple persons r\xc9sume.'},
+            )
 
         self.handler.dispatch(event)
 
@@ -242,24 +374,12 @@ class TestHandler(TestCase):
         Noting happen if comment was not created, but rather edited or removed,
         so that we don't trigger the same action multiple times.
         """
-        content = {
-            'action': 'deleted',
-            u'issue': {
-                u'pull_request': {u'html_url': u'something'},
-                u'title': u'[#12] Some message r\xc9sume.',
-                u'body': '',
-                'number': 123,
-                'user': {'login': 'ignored'},
-                },
-            u'comment': {
-                u'user': {u'login': u'somebody'},
-                u'body': u'Simple words for simple persons r\xc9sume.',
-                },
-            'repository': {
-                'full_name': 'chevah/github-hooks-server',
-                },
-            }
-        event = Event(name='issue_comment', content=content)
+        event = make_event(
+            'issue_comment',
+            action='deleted',
+            issue={'title': u'[#12] Some message r\xc9sume.'},
+            comment={'body': u'Simple words for simple persons r\xc9sume.'},
+            )
 
         self.handler.dispatch(event)
 
@@ -269,23 +389,18 @@ class TestHandler(TestCase):
         """
         Noting happens if comment is made by a bot.
         """
-        content = {
-            u'issue': {
-                u'pull_request': {u'html_url': u'something'},
-                u'title': u'[#12] Some message r\xc9sume.',
-                u'body': '',
-                'number': 123,
-                'user': {'login': 'ignored'},
-                },
-            u'comment': {
-                u'user': {u'login': u'codecov[bot]', 'type': 'not-a-User'},
-                u'body': u'Attention: Patch coverage is `45.30201%` with `163 lines` in your changes are missing coverage. Please review.',
-                },
-            'repository': {
-                'full_name': 'chevah/github-hooks-server',
+        event = make_event(
+            'issue_comment',
+            issue={'title': u'[#12] Some message r\xc9sume.'},
+            comment={
+                'user': {'login': u'codecov[bot]', 'type': 'not-a-User'},
+                'body': (
+                    u'Attention: Patch coverage is `45.30201%` with '
+                    u'`163 lines` in your changes are missing coverage. '
+                    u'Please review.'
+                    ),
                 },
-            }
-        event = Event(name='issue_comment', content=content)
+            )
 
         self.handler.dispatch(event)
 
@@ -295,24 +410,15 @@ class TestHandler(TestCase):
         """
         Nothing happens when the action is not one of submission.
         """
-        content = {
-            'action': 'dismissed',
-            'pull_request': {
+        event = make_event(
+            'pull_request_review',
+            action='dismissed',
+            pull_request={
                 'title': 'Some message.',
                 'body': 'bla\r\nreviewers @tu @adiroiban\r\nbla',
-                'number': 8,
-                'user': {'login': 'adiroiban'},
                 },
-            'review': {
-                'user': {'login': 'tu'},
-                'body': 'anything here.',
-                'state': 'changes_requested',
-                },
-            'repository': {
-                'full_name': 'chevah/github-hooks-server',
-                },
-            }
-        event = Event(name='pull_request_review', content=content)
+            review={'state': 'changes_requested'},
+            )
 
         self.handler.dispatch(event)
 
@@ -322,25 +428,10 @@ class TestHandler(TestCase):
         """
         Nothing happens when we get a simple review comment.
         """
-        content = {
-            'pull_request': {
-                'title': '[#42] Some message.',
-                'body': 'bla\r\nreviewers @tu @adiroiban\r\nbla',
-                'user': {'login': 'adiroiban'},
-                'number': 8,
-                'requested_reviewers': [],
-                'requested_teams': [],
-                },
-            'review': {
-                'user': {'login': 'tu'},
-                'body': 'anything here.',
-                'state': 'commented',
-                },
-            'repository': {
-                'full_name': 'chevah/github-hooks-server',
-                },
-            }
-        event = Event(name='pull_request_review', content=content)
+        event = make_event(
+            'pull_request_review',
+            pull_request={'body': 'bla\r\nreviewers @tu @adiroiban\r\nbla'},
+            )
 
         self.handler.dispatch(event)
 
@@ -373,12 +464,16 @@ class TestHandler(TestCase):
             'Reviewers:',
             ]
 
+        # Bound once so the loop skips the attribute lookups.
+        get_reviewers = self.handler._getReviewers
         for marker in markers:
-            message = u'Simple r\xc9sume\r\n%s @io @ala bla\r\nbla' % (marker)
+            with self.subTest(marker=marker):
+                message = (
+                    u'Simple r\xc9sume\r\n%s @io @ala bla\r\nbla' % (marker))
 
-            result = self.handler._getReviewers(message, None, 'ready_for_review')
+                result = get_reviewers(message, None, 'ready_for_review')
 
-            self.assertEqual([u'io', u'ala'], result)
+                self.assertEqual([u'io', u'ala'], result)
 
     def test_getReviewers_spaces(self):
         """
@@ -400,6 +495,22 @@ class TestHandler(TestCase):
 
             self.assertEqual([u'io', u'ala'], result, f'Message was: {message}')
 
+    def test_getReviewers_next_line(self):
+        """
+        A nickname on the line after the reviewers keyword is not
+        a reviewer request; the keyword and the nicknames must share a line.
+        """
+        for message in [
+            u'Simple r\xc9sume\r\nthe reviewers\r\n@io please look',
+            u'Simple r\xc9sume\r\nreviewers:\r\n@io @ala bla',
+            u'Simple r\xc9sume\r\nreviewers:\n@io @ala bla',
+            ]:
+
+            result = self.handler._getReviewers(
+                message, 'some/repo', 'ready_for_review')
+
+            self.assertEqual([], result, f'Message was: {message}')
+
     def test_getReviewers_None(self):
         """
         The message body can be None.
@@ -478,6 +589,17 @@ class TestHandler(TestCase):
 
         self.assertFalse(result)
 
+    def test_needsReview_not_at_line_start(self):
+        """
+        The `review-please` spelling only counts at the start of a line,
+        so it can be quoted or discussed mid-sentence without triggering.
+        """
+        message = u'Simple r\xc9sume\r\nbla REVIEW-PLEASE bla\r\nbla'
+
+        result = self.handler._needsReview(message)
+
+        self.assertFalse(result)
+
     def test_needsReview_true(self):
         """
         True is returned if message contains one of the needs review markers.
@@ -502,12 +624,15 @@ class TestHandler(TestCase):
             'REVIEW PLEASE',
             ]
 
+        # Bound once so the loop skips the attribute lookups.
+        needs_review = self.handler._needsReview
         for marker in markers:
-            message = u'Simple r\xc9sume\r\n%s bla\r\nbla' % (marker)
+            with self.subTest(marker=marker):
+                message = u'Simple r\xc9sume\r\n%s bla\r\nbla' % (marker)
 
-            result = self.handler._needsReview(message)
+                result = needs_review(message)
 
-            self.assertTrue(result)
+                self.assertTrue(result)
 
     def test_needsChanges_false(self):
         """
@@ -534,12 +659,15 @@ class TestHandler(TestCase):
             '**needs-changes**',
             ]
 
+        # Bound once so the loop skips the attribute lookups.
+        needs_changes = self.handler._needsChanges
         for marker in markers:
-            message = u'Simple r\xc9sume\r\n%s bla\r\nbla' % (marker)
+            with self.subTest(marker=marker):
+                message = u'Simple r\xc9sume\r\n%s bla\r\nbla' % (marker)
 
-            result = self.handler._needsChanges(message)
+                result = needs_changes(message)
 
-            self.assertTrue(result)
+                self.assertTrue(result)
 
     def test_changesApproved_false(self):
         """
@@ -551,6 +679,17 @@ class TestHandler(TestCase):
 
         self.assertFalse(result)
 
+    def test_changesApproved_not_at_line_start(self):
+        """
+        The `approved-at` spelling only counts at the start of a line,
+        so it can be quoted or discussed mid-sentence without triggering.
+        """
+        message = u'Simple r\xc9sume approved-at SHA\r\nbla'
+
+        result = self.handler._changesApproved(message)
+
+        self.assertFalse(result)
+
     def test_changesApproved_true(self):
         """
         True is returned if message contains one of the approved markers.
@@ -564,12 +703,15 @@ class TestHandler(TestCase):
             'approved-at SHA',
             ]
 
+        # Bound once so the loop skips the attribute lookups.
+        changes_approved = self.handler._changesApproved
         for marker in markers:
-            message = u'Simple r\xc9sume\r\n%s bla\r\nbla' % (marker)
+            with self.subTest(marker=marker):
+                message = u'Simple r\xc9sume\r\n%s bla\r\nbla' % (marker)
 
-            result = self.handler._changesApproved(message)
+                result = changes_approved(message)
 
-            self.assertTrue(result)
+                self.assertTrue(result)
 
 
 def get_all_reviewers(pull):
@@ -735,30 +877,319 @@ class StubTeam:
         self.slug = slug
 
 
-class TestLiveHandler(TestCase):
+class StubLabel:
+    """
+    A stub for a ShortLabel returned by Github3.
+    """
+    def __init__(self, name):
+        self.name = name
+
+
+class _NotFoundResponse:
+    """
+    The minimal HTTP response needed to raise a github3 NotFoundError.
+    """
+    status_code = 404
+    content = b'not found'
+
+    def json(self):
+        return {'message': 'Not Found'}
+
+
+class FakePull:
+    """
+    An in-memory stand-in for a github3 pull request.
+
+    Tracks review requests and replays canned reviews.
+    """
+    def __init__(self):
+        self.requested_reviewers = []
+        self.requested_teams = []
+        self._reviews = []
+
+    def reviews(self):
+        return list(self._reviews)
+
+    def create_review_requests(self, reviewers=None, team_reviewers=None):
+        current = [u.login for u in self.requested_reviewers]
+        for login in reviewers or []:
+            if login not in current:
+                self.requested_reviewers.append(StubUser(login))
+        current = [t.slug for t in self.requested_teams]
+        for slug in team_reviewers or []:
+            if slug not in current:
+                self.requested_teams.append(StubTeam(slug))
+
+    def delete_review_requests(self, reviewers=None, team_reviewers=None):
+        # The real API accepts both login strings and user objects.
+        logins = {getattr(u, 'login', u) for u in reviewers or []}
+        self.requested_reviewers = [
+            u for u in self.requested_reviewers if u.login not in logins]
+        slugs = {getattr(t, 'slug', t) for t in team_reviewers or []}
+        self.requested_teams = [
+            t for t in self.requested_teams if t.slug not in slugs]
+
+
+class FakeIssue:
+    """
+    An in-memory stand-in for a github3 issue.
+
+    Stores labels and assignees, and exposes its pull request.
+    """
+    def __init__(self):
+        self._labels = set()
+        self.assignees = []
+        self._pull = FakePull()
+
+    def labels(self):
+        return [StubLabel(name) for name in sorted(self._labels)]
+
+    def add_labels(self, *labels):
+        self._labels.update(labels)
+
+    def remove_label(self, label):
+        import github3
+        if label not in self._labels:
+            raise github3.exceptions.NotFoundError(_NotFoundResponse())
+        self._labels.remove(label)
+
+    def replace_labels(self, labels):
+        self._labels = set(labels)
+
+    def edit(self, assignees=None, labels=None):
+        if assignees is not None:
+            self.assignees = [StubUser(login) for login in assignees]
+        if labels is not None:
+            self._labels = set(labels)
+
+    def pull_request(self):
+        return self._pull
+
+
+class FakeGithub:
+    """
+    An in-memory stand-in for a github3 GitHub instance.
+
+    It keeps per-issue state so the handler scenarios can run
+    without any network access.
+    """
+    session = StubSession()
+
+    def __init__(self):
+        self._issues = {}
+
+    def issue(self, username, repository, number):
+        key = (username, repository, number)
+        if key not in self._issues:
+            self._issues[key] = FakeIssue()
+        return self._issues[key]
+
+    def pull_request(self, username, repository, number):
+        return self.issue(username, repository, number).pull_request()
+
+
+class TestHandlerIntegration(LogAssertingTestCase):
+    """
+    Runs the review-flow scenarios against an in-memory fake GitHub.
+
+    These cover the same flows as TestLiveHandler,
+    but at Python speed and with no token or network access.
+    """
+
+    def setUp(self):
+        super(TestHandlerIntegration, self).setUp()
+        self.github = FakeGithub()
+        self.handler = Handler(self.github, config=config)
+
+    def assertLabels(self, issue, expected):
+        """
+        Check that `issue` has exactly the `expected` label names.
+        """
+        self.assertEqual(set(expected), {l.name for l in issue.labels()})
+
+    def test_issue_comment_needs_review(self):
+        """
+        A needs-review comment sets the label,
+        removes the other state labels
+        and requests reviews from the PR description reviewers.
+        """
+        issue = self.github.issue('chevah', 'github-hooks-server', 123)
+        issue.edit(
+            labels=['needs-changes', 'needs-merge', 'low'],
+            assignees=['adiroiban'],
+            )
+        event = make_event(
+            'issue_comment',
+            issue={'body': u'bla\r\nreviewers @danuker @chevah-robot\r\nbla'},
+            comment={'body': u'One more r\xc9sume\r\n\r\n**needs-review**\r\n'},
+            )
+
+        self.handler.dispatch(event)
+
+        self.assertLog(_EXPECTED_NEEDS_REVIEW % (
+            'issue_comment', 123, "['danuker', 'chevah-robot']"))
+        self.assertLabels(issue, ['needs-review', 'low'])
+        self.assertEqual(['adiroiban'], [u.login for u in issue.assignees])
+        self.assertEqual(
+            ['danuker', 'chevah-robot'],
+            [u.login for u in issue.pull_request().requested_reviewers],
+            )
+
+    def test_pull_request_review_needs_changes(self):
+        """
+        A changes-requested review sets the needs-changes label,
+        clears the pending review requests
+        and assigns the PR back to its author.
+        """
+        issue = self.github.issue('chevah', 'github-hooks-server', 8)
+        issue.edit(
+            labels=['needs-review', 'needs-merge', 'low'],
+            assignees=['chevah-robot'],
+            )
+        issue.pull_request().create_review_requests(
+            reviewers=['ioanacristinamarinescu'])
+        event = make_event(
+            'pull_request_review',
+            pull_request={
+                'requested_reviewers': [{'login': 'ioanacristinamarinescu'}],
+                },
+            review={
+                'user': {'login': 'chevah-robot'},
+                'state': 'changes_requested',
+                },
+            )
+
+        self.handler.dispatch(event)
+
+        self.assertLog(_EXPECTED_NEEDS_CHANGES % (
+            'pull_request_review', 8, 'adiroiban'))
+        self.assertLabels(issue, ['needs-changes', 'low'])
+        self.assertEqual(['adiroiban'], [u.login for u in issue.assignees])
+        self.assertEqual([], issue.pull_request().requested_reviewers)
+        self.assertEqual([], issue.pull_request().requested_teams)
+
+    def test_pull_request_review_approved_last(self):
+        """
+        An approving review with no remaining reviewers
+        moves the PR to needs-merge and assigns the author.
+        """
+        issue = self.github.issue('chevah', 'github-hooks-server', 8)
+        issue.edit(
+            labels=['needs-review', 'needs-changes', 'low'],
+            assignees=['adiroiban'],
+            )
+        issue.pull_request()._reviews = [
+            StubReview('APPROVED', user='chevah-robot')]
+        event = make_event(
+            'pull_request_review',
+            review={'user': {'login': 'chevah-robot'}, 'state': 'approved'},
+            )
+
+        self.handler.dispatch(event)
+
+        self.assertLog(_EXPECTED_APPROVE_CHANGES % (
+            'pull_request_review', 8, 'adiroiban',
+            'chevah-robot', "[]"))
+        self.assertLabels(issue, ['needs-merge', 'low'])
+        self.assertEqual(['adiroiban'], [u.login for u in issue.assignees])
+
+    def test_pull_request_review_approved_still_reviewers(self):
+        """
+        An approving review while other reviewers are still requested
+        leaves the labels alone.
+        """
+        issue = self.github.issue('chevah', 'github-hooks-server', 8)
+        issue.edit(
+            labels=['needs-review', 'low'],
+            assignees=['adiroiban'],
+            )
+        issue.pull_request().create_review_requests(
+            reviewers=['chevah-robot'])
+        issue.pull_request()._reviews = [
+            StubReview('APPROVED', user='danuker')]
+        event = make_event(
+            'pull_request_review',
+            pull_request={'requested_reviewers': [StubUser('chevah-robot')]},
+            review={'user': {'login': 'danuker'}, 'state': 'approved'},
+            )
+
+        self.handler.dispatch(event)
+
+        self.assertLog(_EXPECTED_APPROVE_CHANGES % (
+            'pull_request_review', 8, 'adiroiban',
+            'danuker', "['chevah-robot']"))
+        self.assertLabels(issue, ['needs-review', 'low'])
+        self.assertEqual(
+            ['chevah-robot'],
+            [u.login for u in issue.pull_request().requested_reviewers],
+            )
+
+    def test_issue_comment_approved_last(self):
+        """
+        A changes-approved comment from the last requested reviewer
+        drops the review request and moves the PR to needs-merge.
+        """
+        issue = self.github.issue('chevah', 'github-hooks-server', 123)
+        issue.edit(
+            labels=['needs-review', 'low'],
+            assignees=['adiroiban'],
+            )
+        issue.pull_request().create_review_requests(
+            reviewers=['chevah-robot'])
+        event = make_event(
+            'issue_comment',
+            comment={
+                'user': {'login': 'chevah-robot', 'type': 'User'},
+                'body': u'Simple words r\xc9sume \r\n**changes-approved** p.',
+                },
+            )
+
+        self.handler.dispatch(event)
+
+        self.assertLog(_EXPECTED_APPROVE_CHANGES % (
+            'issue_comment', 123, 'ignored',
+            'chevah-robot', "[]"))
+        self.assertLabels(issue, ['needs-merge', 'low'])
+        self.assertEqual(['ignored'], [u.login for u in issue.assignees])
+        self.assertEqual([], issue.pull_request().requested_reviewers)
+
+
+@pytest.mark.slow
+@pytest.mark.live
+@skipUnless(
+    os.environ.get('CHEVAH_GITHUB_LIVE'),
+    'Set CHEVAH_GITHUB_LIVE=1 to run the live GitHub tests.')
+class TestLiveHandler(LogAssertingTestCase):
     """
     Tests requiring a real GitHub connection.
+    These are skipped unless CHEVAH_GITHUB_LIVE is set in the environment.
     It needs `github_token` to be defined in
     `chevah/github_hooks_server/tests/private.py`.
     """
+    @classmethod
+    def setUpClass(cls):
+        super(TestLiveHandler, cls).setUpClass()
+        # Imported here so that collecting the offline tests
+        # does not pay for the github3 import chain.
+        import github3
+        # One authenticated session for the whole class:
+        # each login() builds a new requests.Session
+        # with its own TLS setup.
+        cls._gh = github3.login(token=github_token)
+
     def setUp(self):
         super(TestLiveHandler, self).setUp()
-        self.handler = Handler(
-            github3.login(token=github_token), config=config
-            )
-
-        self.log_asserter, self.logger = LogAsserter.createWithLogger()
-
-    def tearDown(self):
-        self.logger.removeHandler(self.log_asserter)
-        self.log_asserter.assertLogEmpty()
-        super(TestLiveHandler, self).tearDown()
+        self.handler = Handler(self._gh, config=config)
+        # The issue under test, fetched once and reused by the helpers.
+        self._issue = self.handler._github.issue(
+            'chevah', 'github-hooks-server', 8)
 
-    def assertLog(self, expected):
+    def _assert_logins(self, expected, users):
         """
-        Forward to the LogAsserter method.
+        Check that `users` have exactly the `expected` logins, in any order.
         """
-        return self.log_asserter.assertLog(expected)
+        self.assertEqual(
+            sorted(expected), sorted(map(attrgetter('login'), users)))
 
 #
 # --------------------- needs-review ------------------------------------------
@@ -766,26 +1197,46 @@ class TestLiveHandler(TestCase):
 # The creator of the PR (and review-requester) is adiroiban,
 # and the reviewers are danuker and/or chevah-robot.
 
+    def _prepare(self, labels, assignees, missing_label):
+        """
+        Reset the state of the test PR and check that it was applied.
+
+        A single PATCH sets both labels and assignees,
+        and the response refreshes the issue object,
+        so the sanity checks need no extra API reads.
+        The PATCH is skipped when the issue fetched in setUp
+        already carries the wanted state,
+        as happens when tests run back to back.
+        """
+        issue = self._issue
+        current_labels = {l.name for l in issue.original_labels}
+        current_assignees = sorted(u.login for u in issue.assignees)
+        if (current_labels != set(labels)
+                or current_assignees != sorted(assignees)):
+            issue.edit(labels=labels, assignees=assignees)
+            current_labels = {l.name for l in issue.original_labels}
+        for label in labels:
+            self.assertIn(label, current_labels)
+        self.assertNotIn(missing_label, current_labels)
+        self._assert_logins(assignees, issue.assignees)
+        return issue
+
     def prepareToNeedReview(self):
         """
         Prepare the PR so that it will need review.
 
         Assigned is none of the reviewers and PR has other labels.
         """
-        issue = self.handler._github.issue('chevah', 'github-hooks-server', 8)
-        issue.replace_labels(['needs-changes', 'needs-merge', 'low'])
-        issue.edit(assignees=['adiroiban'])
+        issue = self._prepare(
+            labels=['needs-changes', 'needs-merge', 'low'],
+            assignees=['adiroiban'],
+            missing_label='needs-review',
+            )
         pr = issue.pull_request()
         pr.delete_review_requests(
             reviewers=pr.requested_reviewers,
             team_reviewers=pr.requested_teams,
             )
-        initial_labels = [l.name for l in issue.labels()]
-        self.assertIn('needs-changes', initial_labels)
-        self.assertIn('needs-merge', initial_labels)
-        self.assertIn('low', initial_labels)
-        self.assertNotIn('needs-review', initial_labels)
-        self.assertEqual(['adiroiban'], [u.login for u in issue.assignees])
         # Must retrieve the requested reviewers again, in order to check them.
         self.assertEqual(
             [], [u.login for u in issue.pull_request().requested_reviewers]
@@ -807,16 +1258,18 @@ class TestLiveHandler(TestCase):
             from_users = ['danuker', 'chevah-robot']
         if from_teams is None:
             from_teams = []
-        issue = self.handler._github.issue('chevah', 'github-hooks-server', 8)
-        last_labels = [l.name for l in issue.labels()]
+        issue = self._issue
+        # The refreshed payload already carries labels and assignees,
+        # so no further API reads are needed for them.
+        issue.refresh()
+        last_labels = {l.name for l in issue.original_labels}
         self.assertIn('needs-review', last_labels)
         self.assertIn('low', last_labels)
         self.assertNotIn('needs-changes', last_labels)
         self.assertNotIn('needs-merge', last_labels)
-        self.assertEqual(['adiroiban'], [u.login for u in issue.assignees])
-        self.assertCountEqual(
-            from_users,
-            [u.login for u in issue.pull_request().requested_reviewers])
+        self._assert_logins(['adiroiban'], issue.assignees)
+        self._assert_logins(
+            from_users, issue.pull_request().requested_reviewers)
         self.assertCountEqual(
             from_teams,
             [t.slug for t in issue.pull_request().requested_teams])
@@ -827,35 +1280,22 @@ class TestLiveHandler(TestCase):
         **needs-review** marker and other review labels are removed.
         """
         body = u'One more r\xc9sume\r\n\r\n**needs-review**\r\n'
-        content = {
-            u'issue': {
-                u'pull_request': {u'html_url': u'something'},
-                u'title': u'[#12] Some message.',
-                u'body': u'bla\r\nreviewers @danuker @chevah-robot\r\nbla',
+        event = make_event(
+            'issue_comment',
+            issue={
+                'body': u'bla\r\nreviewers @danuker @chevah-robot\r\nbla',
                 'number': 8,
                 'user': {'login': 'adiroiban'},
                 },
-            u'comment': {
-                u'user': {u'login': 'somebody', 'type': 'User'},
-                u'body': body,
-                },
-            'repository': {
-                'full_name': 'chevah/github-hooks-server',
-                },
-            }
+            comment={'body': body},
+            )
 
         self.prepareToNeedReview()
-        event = Event(name='issue_comment', content=content)
 
         self.handler.dispatch(event)
 
-        self.assertLog(
-            "_setNeedsReview "
-            "event=issue_comment, "
-            "repo=chevah/github-hooks-server, "
-            "pull_id=8, "
-            "reviewers=['danuker', 'chevah-robot']"
-            )
+        self.assertLog(_EXPECTED_NEEDS_REVIEW % (
+            'issue_comment', 8, "['danuker', 'chevah-robot']"))
         self.assertReviewRequested()
 
     def test_issue_comment_needs_review_team(self):
@@ -868,34 +1308,21 @@ class TestLiveHandler(TestCase):
         """
 
         body = u'One more r\xc9sume\r\n\r\n**needs-review**\r\n'
-        content = {
-            u'issue': {
-                u'pull_request': {u'html_url': u'something'},
-                u'title': u'[#12] Some message.',
-                u'body': u'bla\r\nbla',
+        event = make_event(
+            'issue_comment',
+            issue={
+                'body': u'bla\r\nbla',
                 'number': 8,
                 'user': {'login': 'adiroiban'},
                 },
-            u'comment': {
-                u'user': {u'login': 'somebody', 'type': 'User'},
-                u'body': body,
-                },
-            'repository': {
-                'full_name': 'chevah/github-hooks-server',
-                },
-            }
+            comment={'body': body},
+            )
 
         self.prepareToNeedReview()
-        event = Event(name='issue_comment', content=content)
         self.handler.dispatch(event)
 
-        self.assertLog(
-            "_setNeedsReview "
-            "event=issue_comment, "
-            "repo=chevah/github-hooks-server, "
-            "pull_id=8, "
-            "reviewers=['chevah/the-b-team']"
-            )
+        self.assertLog(_EXPECTED_NEEDS_REVIEW % (
+            'issue_comment', 8, "['chevah/the-b-team']"))
         self.assertReviewRequested(from_users=[], from_teams=['the-b-team'])
 
     def test_review_requested_needs_review(self):
@@ -916,33 +1343,21 @@ class TestLiveHandler(TestCase):
                 requested_reviewers = [
                     StubUser('danuker'), {'login': 'chevah-robot'}]
 
-            content = {
-                'action': action,
-                'pull_request': {
-                    'html_url': 'something',
-                    'title': '[#12] Some message.',
+            event = make_event(
+                'pull_request',
+                action=action,
+                pull_request={
                     'body': 'bla\r\nreviewers @danuker @chevah-robot\r\nbla',
-                    'number': 8,
-                    'user': {'login': 'adiroiban'},
                     'requested_reviewers': requested_reviewers,
                     },
-                'repository': {
-                    'full_name': 'chevah/github-hooks-server',
-                    },
-                }
+                )
 
             self.prepareToNeedReview()
-            event = Event(name='pull_request', content=content)
 
             self.handler.dispatch(event)
 
-            self.assertLog(
-                "_setNeedsReview "
-                "event=pull_request, "
-                "repo=chevah/github-hooks-server, "
-                "pull_id=8, "
-                "reviewers=['danuker', 'chevah-robot']"
-                )
+            self.assertLog(_EXPECTED_NEEDS_REVIEW % (
+                'pull_request', 8, "['danuker', 'chevah-robot']"))
 
         self.assertReviewRequested()
 
@@ -958,33 +1373,21 @@ class TestLiveHandler(TestCase):
             if action == 'review_requested':
                 requested_reviewers = [StubUser('danuker')]
 
-            content = {
-                'action': action,
-                'pull_request': {
-                    'html_url': 'something',
-                    'title': '[#12] Some message.',
+            event = make_event(
+                'pull_request',
+                action=action,
+                pull_request={
                     'body': 'bla\r\nreviewers @danuker @chevah-robot\r\nbla',
-                    'number': 8,
-                    'user': {'login': 'adiroiban'},
                     'requested_reviewers': requested_reviewers,
                     },
-                'repository': {
-                    'full_name': 'chevah/github-hooks-server',
-                    },
-                }
+                )
 
             self.prepareToNeedReview()
-            event = Event(name='pull_request', content=content)
 
             self.handler.dispatch(event)
 
-            self.assertLog(
-                "_setNeedsReview "
-                "event=pull_request, "
-                "repo=chevah/github-hooks-server, "
-                "pull_id=8, "
-                "reviewers=['danuker', 'chevah-robot']"
-                )
+            self.assertLog(_EXPECTED_NEEDS_REVIEW % (
+                'pull_request', 8, "['danuker', 'chevah-robot']"))
 
         self.assertReviewRequested()
 
@@ -1001,35 +1404,19 @@ class TestLiveHandler(TestCase):
 
         Does not delete pre-existing review requests (here, for danuker).
         """
-        content = {
-            'action': 'review_requested',
-            'pull_request': {
-                'html_url': 'something',
-                'title': '[#12] Some message.',
-                'body': 'bla\r\nbla',
-                'number': 8,
-                'user': {'login': 'adiroiban'},
-                'requested_reviewers': [StubUser('danuker')],
-                },
-            'repository': {
-                'full_name': 'chevah/github-hooks-server',
-                },
-            }
+        event = make_event(
+            'pull_request',
+            action='review_requested',
+            pull_request={'requested_reviewers': [StubUser('danuker')]},
+            )
 
         issue, stale_pr = self.prepareToNeedReview()
         stale_pr.create_review_requests(['danuker'])
 
-        event = Event(name='pull_request', content=content)
-
         self.handler.dispatch(event)
 
-        self.assertLog(
-            "_setNeedsReview "
-            "event=pull_request, "
-            "repo=chevah/github-hooks-server, "
-            "pull_id=8, "
-            "reviewers=['danuker']"
-            )
+        self.assertLog(_EXPECTED_NEEDS_REVIEW % (
+            'pull_request', 8, "['danuker']"))
         self.assertReviewRequested(from_users=['danuker'])
 
     def test_needs_review_nonexistent_user(self):
@@ -1038,35 +1425,22 @@ class TestLiveHandler(TestCase):
         the labels are still set.
         """
         body = u'One more r\xc9sume\r\n\r\n**needs-review**\r\n'
-        content = {
-            u'issue': {
-                u'pull_request': {u'html_url': u'something'},
-                u'title': u'[#12] Some message.',
-                u'body': u'bla\r\nreviewers @nonexistent_user\r\nbla',
+        event = make_event(
+            'issue_comment',
+            issue={
+                'body': u'bla\r\nreviewers @nonexistent_user\r\nbla',
                 'number': 8,
                 'user': {'login': 'adiroiban'},
                 },
-            u'comment': {
-                u'user': {u'login': 'somebody', 'type': 'User'},
-                u'body': body,
-                },
-            'repository': {
-                'full_name': 'chevah/github-hooks-server',
-                },
-            }
+            comment={'body': body},
+            )
 
         self.prepareToNeedReview()
-        event = Event(name='issue_comment', content=content)
 
         self.handler.dispatch(event)
 
-        self.assertLog(
-            "_setNeedsReview "
-            "event=issue_comment, "
-            "repo=chevah/github-hooks-server, "
-            "pull_id=8, "
-            "reviewers=['nonexistent_user']"
-            )
+        self.assertLog(_EXPECTED_NEEDS_REVIEW % (
+            'issue_comment', 8, "['nonexistent_user']"))
         self.assertReviewRequested(from_users=[])
 
     def test_pull_request_review_comment_asking_for_review(self):
@@ -1075,37 +1449,20 @@ class TestLiveHandler(TestCase):
         when a review is requested via a PR review comment.
         """
         body = u'Please review this PR.'
-        content = {
-            'pull_request': {
-                'title': '[#42] Some message.',
-                u'body': u'bla\r\nreviewers @danuker @chevah-robot\r\nbla',
-                'number': 8,
-                'user': {'login': 'adiroiban'},
-                'requested_reviewers': [],
-                'requested_teams': [],
-                },
-            'review': {
-                'user': {'login': 'adiroiban'},
-                'body': body,
-                'state': 'commented',
+        event = make_event(
+            'pull_request_review',
+            pull_request={
+                'body': u'bla\r\nreviewers @danuker @chevah-robot\r\nbla',
                 },
-            'repository': {
-                'full_name': 'chevah/github-hooks-server',
-                },
-            }
+            review={'user': {'login': 'adiroiban'}, 'body': body},
+            )
 
         self.prepareToNeedReview()
-        event = Event(name='pull_request_review', content=content)
 
         self.handler.dispatch(event)
 
-        self.assertLog(
-            "_setNeedsReview "
-            "event=pull_request_review, "
-            "repo=chevah/github-hooks-server, "
-            "pull_id=8, "
-            "reviewers=['danuker', 'chevah-robot']"
-            )
+        self.assertLog(_EXPECTED_NEEDS_REVIEW % (
+            'pull_request_review', 8, "['danuker', 'chevah-robot']"))
         self.assertReviewRequested()
 
 #
@@ -1122,15 +1479,11 @@ class TestLiveHandler(TestCase):
         if from_teams is None:
             from_teams = ['the-b-team']
 
-        issue = self.handler._github.issue('chevah', 'github-hooks-server', 8)
-        issue.replace_labels(['needs-review', 'needs-merge', 'low'])
-        issue.edit(assignees=['chevah-robot'])
-        initial_labels = [l.name for l in issue.labels()]
-        self.assertIn('needs-review', initial_labels)
-        self.assertIn('needs-merge', initial_labels)
-        self.assertIn('low', initial_labels)
-        self.assertNotIn('needs-changes', initial_labels)
-        self.assertEqual(['chevah-robot'], [u.login for u in issue.assignees])
+        issue = self._prepare(
+            labels=['needs-review', 'needs-merge', 'low'],
+            assignees=['chevah-robot'],
+            missing_label='needs-changes',
+            )
         issue.pull_request().create_review_requests(
             reviewers=from_reviewers, team_reviewers=from_teams
             )
@@ -1142,15 +1495,17 @@ class TestLiveHandler(TestCase):
         Label is needs-changes and author is set at assignee.
         Review requests are emptied.
         """
-        issue = self.handler._github.issue('chevah', 'github-hooks-server', 8)
-        last_labels = [l.name for l in issue.labels()]
+        issue = self._issue
+        # The refreshed payload already carries labels and assignees,
+        # so no further API reads are needed for them.
+        issue.refresh()
+        last_labels = {l.name for l in issue.original_labels}
         self.assertIn('needs-changes', last_labels)
         self.assertIn('low', last_labels)
         self.assertNotIn('needs-review', last_labels)
         self.assertNotIn('needs-merge', last_labels)
-        self.assertCountEqual(
-            ['adiroiban'], [u.login for u in issue.assignees])
-        self.assertCountEqual([], issue.pull_request().requested_reviewers)
+        self._assert_logins(['adiroiban'], issue.assignees)
+        self._assert_logins([], issue.pull_request().requested_reviewers)
         self.assertCountEqual([], issue.pull_request().requested_teams)
 
     def test_issue_comment_request_changes(self):
@@ -1159,33 +1514,20 @@ class TestLiveHandler(TestCase):
         **needs-changes** marker and the PR is assigned to the original author.
         """
         self.prepareToRequestChanges()
-        content = {
-            u'issue': {
-                'pull_request': {u'html_url': u'something'},
+        event = make_event(
+            'issue_comment',
+            issue={
                 'title': u'[#12] Some message r\xc9sume.',
-                'body': '',
                 'number': 8,
                 'user': {'login': 'adiroiban'},
                 },
-            u'comment': {
-                u'user': {u'login': u'somebody', 'type': 'User'},
-                u'body': u'Simple r\xc9sume \r\n**needs-changes** magic.',
-                },
-            'repository': {
-                'full_name': 'chevah/github-hooks-server',
-                },
-            }
-        event = Event(name='issue_comment', content=content)
+            comment={'body': u'Simple r\xc9sume \r\n**needs-changes** magic.'},
+            )
 
         self.handler.dispatch(event)
 
-        self.assertLog(
-            '_setNeedsChanges '
-            'event=issue_comment, '
-            'repo=chevah/github-hooks-server, '
-            'pull_id=8, '
-            'author_name=adiroiban'
-            )
+        self.assertLog(_EXPECTED_NEEDS_CHANGES % (
+            'issue_comment', 8, 'adiroiban'))
         self.assertChangesRequested()
 
     def test_pull_request_review_needs_changes(self):
@@ -1194,35 +1536,21 @@ class TestLiveHandler(TestCase):
         in the needs-changes state, and any other review requests are removed.
         """
         self.prepareToRequestChanges()
-        content = {
-            'pull_request': {
-                'title': '[#42] Some message.',
-                'body': 'bla\r\nbla',
-                'user': {'login': 'adiroiban'},
-                'number': 8,
+        event = make_event(
+            'pull_request_review',
+            pull_request={
                 'requested_reviewers': [{'login': 'ioanacristinamarinescu'}],
-                'requested_teams': [],
                 },
-            'review': {
+            review={
                 'user': {'login': 'chevah-robot'},
-                'body': 'anything here.',
                 'state': 'changes_requested',
                 },
-            'repository': {
-                'full_name': 'chevah/github-hooks-server',
-                },
-            }
-        event = Event(name='pull_request_review', content=content)
+            )
 
         self.handler.dispatch(event)
 
-        self.assertLog(
-            '_setNeedsChanges '
-            'event=pull_request_review, '
-            'repo=chevah/github-hooks-server, '
-            'pull_id=8, '
-            'author_name=adiroiban'
-            )
+        self.assertLog(_EXPECTED_NEEDS_CHANGES % (
+            'pull_request_review', 8, 'adiroiban'))
         self.assertChangesRequested()
 
 #
@@ -1235,21 +1563,17 @@ class TestLiveHandler(TestCase):
         Only one review is requested, the reviewer is assigned,
         and label is not needs-merge.
         """
-        issue = self.handler._github.issue('chevah', 'github-hooks-server', 8)
+        issue = self._prepare(
+            labels=['needs-review', 'needs-changes', 'low'],
+            assignees=['adiroiban'],
+            missing_label='needs-merge',
+            )
         pr = issue.pull_request()
         pr.delete_review_requests(
             reviewers=pr.requested_reviewers,
             team_reviewers=pr.requested_teams,
             )
         pr.create_review_requests(['chevah-robot'])
-        issue.edit(assignees=['adiroiban'])
-        issue.replace_labels(['needs-review', 'needs-changes', 'low'])
-        initial_labels = [l.name for l in issue.labels()]
-        self.assertIn('needs-review', initial_labels)
-        self.assertIn('needs-changes', initial_labels)
-        self.assertIn('low', initial_labels)
-        self.assertNotIn('needs-merge', initial_labels)
-        self.assertEqual(['adiroiban'], [u.login for u in issue.assignees])
         return pr
 
     def assertMergeRequested(self):
@@ -1258,19 +1582,20 @@ class TestLiveHandler(TestCase):
 
         Label is needs-merge and author is set as assignee.
         """
-        issue = self.handler._github.issue('chevah', 'github-hooks-server', 8)
-        last_labels = [l.name for l in issue.labels()]
+        issue = self._issue
+        # The refreshed payload already carries labels and assignees,
+        # so no further API reads are needed for them.
+        issue.refresh()
+        last_labels = {l.name for l in issue.original_labels}
         self.assertIn('needs-merge', last_labels)
         self.assertIn('low', last_labels)
         self.assertNotIn('needs-review', last_labels)
         self.assertNotIn('needs-changes', last_labels)
-        self.assertCountEqual(
-            ['adiroiban'], [u.login for u in issue.assignees])
+        self._assert_logins(['adiroiban'], issue.assignees)
 
         # No more review requests.
         pr = issue.pull_request()
-        self.assertCountEqual(
-            [], [u.login for u in pr.requested_reviewers])
+        self._assert_logins([], pr.requested_reviewers)
 
     def test_issue_comment_approved_last(self):
         """
@@ -1279,38 +1604,25 @@ class TestLiveHandler(TestCase):
         and the user is the last reviewer (no others in `remaining_reviewers`).
         """
         self.prepareToApproveLast()
-        content = {
-            'issue': {
-                'pull_request': {u'html_url': u'something'},
+        event = make_event(
+            'issue_comment',
+            issue={
                 'title': '[#12] Some message r\xc9sume.',
-                'body': (
-                    'r\xc9sume bla\r\n'
-                    'bla'
-                    ),
+                'body': 'r\xc9sume bla\r\nbla',
                 'number': 8,
                 'user': {'login': 'adiroiban'},
                 },
-            'comment': {
+            comment={
                 'user': {'login': 'chevah-robot', 'type': 'User'},
                 'body': 'Simple words r\xc9sume \r\n**changes-approved** p.',
                 },
-            'repository': {
-                'full_name': 'chevah/github-hooks-server',
-                },
-            }
-        event = Event(name='issue_comment', content=content)
+            )
 
         self.handler.dispatch(event)
 
-        self.assertLog(
-            "_setApproveChanges "
-            "event=issue_comment, "
-            "repo=chevah/github-hooks-server, "
-            "pull_id=8, "
-            "author_name=adiroiban, "
-            "reviewer_name=chevah-robot, "
-            "remaining_reviewers=[]"
-            )
+        self.assertLog(_EXPECTED_APPROVE_CHANGES % (
+            'issue_comment', 8, 'adiroiban',
+            'chevah-robot', "[]"))
         self.assertMergeRequested()
 
     def test_pull_request_review_approved_last(self):
@@ -1324,37 +1636,16 @@ class TestLiveHandler(TestCase):
         pr.delete_review_requests(['chevah-robot'])
 
         # And GitHub sends us an API call in consequence.
-        content = {
-            'pull_request': {
-                'title': '[#42] Some message.',
-                'body': 'bla\r\nbla',
-                'number': 8,
-                'user': {'login': 'adiroiban'},
-                'requested_reviewers': [],
-                'requested_teams': [],
-                },
-            'review': {
-                'user': {'login': 'chevah-robot'},
-                'body': 'anything here.',
-                'state': 'approved',
-                },
-            'repository': {
-                'full_name': 'chevah/github-hooks-server',
-                },
-            }
-        event = Event(name='pull_request_review', content=content)
+        event = make_event(
+            'pull_request_review',
+            review={'user': {'login': 'chevah-robot'}, 'state': 'approved'},
+            )
 
         self.handler.dispatch(event)
 
-        self.assertLog(
-            '_setApproveChanges '
-            'event=pull_request_review, '
-            'repo=chevah/github-hooks-server, '
-            'pull_id=8, '
-            'author_name=adiroiban, '
-            'reviewer_name=chevah-robot, '
-            "remaining_reviewers=[]"
-            )
+        self.assertLog(_EXPECTED_APPROVE_CHANGES % (
+            'pull_request_review', 8, 'adiroiban',
+            'chevah-robot', "[]"))
         self.assertMergeRequested()
 
 #
@@ -1365,9 +1656,11 @@ class TestLiveHandler(TestCase):
         Set up the PR so that we can approve the changes
         and other reviewers still need to review it.
         """
-        issue = self.handler._github.issue('chevah', 'github-hooks-server', 8)
-        issue.replace_labels(['needs-review', 'needs-changes', 'low'])
-        issue.edit(assignees=['adiroiban'])
+        issue = self._prepare(
+            labels=['needs-review', 'needs-changes', 'low'],
+            assignees=['adiroiban'],
+            missing_label='needs-merge',
+            )
 
         # Create review requests for two people.
         pr = issue.pull_request()
@@ -1376,14 +1669,6 @@ class TestLiveHandler(TestCase):
             team_reviewers=pr.requested_teams,
             )
         pr.create_review_requests(['chevah-robot', 'danuker'])
-
-        initial_labels = [l.name for l in issue.labels()]
-        self.assertIn('needs-review', initial_labels)
-        self.assertIn('needs-changes', initial_labels)
-        self.assertIn('low', initial_labels)
-        self.assertNotIn('needs-merge', initial_labels)
-        self.assertCountEqual(
-            ['adiroiban'], [u.login for u in pr.assignees])
         return pr
 
     def assertReviewStillNeeded(self, from_users=None, from_teams=None):
@@ -1399,16 +1684,17 @@ class TestLiveHandler(TestCase):
             from_users = ['chevah-robot']
         if from_teams is None:
             from_teams = []
-        issue = self.handler._github.issue('chevah', 'github-hooks-server', 8)
-        last_labels = [l.name for l in issue.labels()]
+        issue = self._issue
+        # The refreshed payload already carries labels and assignees,
+        # so no further API reads are needed for them.
+        issue.refresh()
+        last_labels = {l.name for l in issue.original_labels}
         self.assertIn('needs-review', last_labels)
         self.assertIn('low', last_labels)
         self.assertIn('needs-changes', last_labels)
-        self.assertEqual(
-            ['adiroiban'], [u.login for u in issue.assignees])
-        self.assertCountEqual(
-            from_users,
-            [u.login for u in issue.pull_request().requested_reviewers])
+        self._assert_logins(['adiroiban'], issue.assignees)
+        self._assert_logins(
+            from_users, issue.pull_request().requested_reviewers)
         self.assertCountEqual(
             from_teams,
             [t.slug for t in issue.pull_request().requested_teams])
@@ -1419,35 +1705,24 @@ class TestLiveHandler(TestCase):
         reviewers, the PR is kept in the same state.
         """
         self.prepareToApproveAndLeaveForReview()
-        content = {
-            'issue': {
-                'pull_request': {'html_url': 'something'},
-                'title': '[#12] Some message.',
+        event = make_event(
+            'issue_comment',
+            issue={
                 'body': 'bla\r\nbla',
                 'number': 8,
                 'user': {'login': 'adiroiban'},
                 },
-            'comment': {
+            comment={
                 'user': {'login': 'danuker', 'type': 'User'},
                 'body': 'Simple words \r\n**changes-approved** magic.',
                 },
-            'repository': {
-                'full_name': 'chevah/github-hooks-server',
-                },
-            }
-        event = Event(name='issue_comment', content=content)
+            )
 
         self.handler.dispatch(event)
 
-        self.assertLog(
-            "_setApproveChanges "
-            "event=issue_comment, "
-            "repo=chevah/github-hooks-server, "
-            "pull_id=8, "
-            "author_name=adiroiban, "
-            "reviewer_name=danuker, "
-            "remaining_reviewers=['chevah-robot']"
-            )
+        self.assertLog(_EXPECTED_APPROVE_CHANGES % (
+            'issue_comment', 8, 'adiroiban',
+            'danuker', "['chevah-robot']"))
         self.assertReviewStillNeeded()
 
     def test_issue_comment_approved_still_reviewers_team(self):
@@ -1465,37 +1740,20 @@ class TestLiveHandler(TestCase):
         pr.delete_review_requests(['danuker', 'chevah-robot'])
 
         # And GitHub sends us an API call in consequence.
-        content = {
-            'pull_request': {
-                'title': '[#42] Some message.',
-                'body': 'bla\r\nbla',
-                'number': 8,
+        event = make_event(
+            'pull_request_review',
+            pull_request={
                 'user': {'login': 'pr-author-ignored'},
-                'requested_reviewers': [],
-                'requested_teams': [StubTeam('the-b-team')]
-                },
-            'review': {
-                'user': {'login': 'danuker'},
-                'body': 'anything here.',
-                'state': 'approved',
-                },
-            'repository': {
-                'full_name': 'chevah/github-hooks-server',
+                'requested_teams': [StubTeam('the-b-team')],
                 },
-            }
-        event = Event(name='pull_request_review', content=content)
+            review={'user': {'login': 'danuker'}, 'state': 'approved'},
+            )
 
         self.handler.dispatch(event)
 
-        self.assertLog(
-            '_setApproveChanges '
-            'event=pull_request_review, '
-            'repo=chevah/github-hooks-server, '
-            'pull_id=8, '
-            'author_name=pr-author-ignored, '
-            'reviewer_name=danuker, '
-            "remaining_reviewers=['chevah/the-b-team']"
-            )
+        self.assertLog(_EXPECTED_APPROVE_CHANGES % (
+            'pull_request_review', 8, 'pr-author-ignored',
+            'danuker', "['chevah/the-b-team']"))
         self.assertReviewStillNeeded(from_users=[], from_teams=['the-b-team'])
 
     def test_pull_request_review_approved_still_reviewers(self):
@@ -1509,35 +1767,15 @@ class TestLiveHandler(TestCase):
         pr.delete_review_requests(['danuker'])
 
         # And GitHub sends us an API call in consequence.
-        content = {
-            'pull_request': {
-                'title': '[#42] Some message.',
-                'body': 'bla\r\nbla',
-                'number': 8,
-                'user': {'login': 'pr-author-ignored'},
-                'requested_reviewers': [StubUser('chevah-robot')],
-                'requested_teams': [],
-                },
-            'review': {
-                'user': {'login': 'danuker'},
-                'body': 'anything here.',
-                'state': 'approved',
-                },
-            'repository': {
-                'full_name': 'chevah/github-hooks-server',
-                },
-            }
-        event = Event(name='pull_request_review', content=content)
+        event = make_event(
+            'pull_request_review',
+            pull_request={'requested_reviewers': [StubUser('chevah-robot')]},
+            review={'user': {'login': 'danuker'}, 'state': 'approved'},
+            )
 
         self.handler.dispatch(event)
 
-        self.assertLog(
-            '_setApproveChanges '
-            'event=pull_request_review, '
-            'repo=chevah/github-hooks-server, '
-            'pull_id=8, '
-            'author_name=pr-author-ignored, '
-            'reviewer_name=danuker, '
-            "remaining_reviewers=['chevah-robot']"
-            )
+        self.assertLog(_EXPECTED_APPROVE_CHANGES % (
+            'pull_request_review', 8, 'pr-author-ignored',
+            'danuker', "['chevah-robot']"))
         self.assertReviewStillNeeded()
@@ -0,0 +1,33 @@
+"""
+Pytest configuration for the repository.
+
+Lives at the root so that pytest picks up the command line
+option before parsing the arguments.
+"""
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--skip-slow',
+        action='store_true',
+        default=False,
+        help='Skip the tests marked as slow.',
+        )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers', 'slow: test takes long to run; skipped by --skip-slow')
+    config.addinivalue_line(
+        'markers', 'live: test talks to the real GitHub API')
+
+
+def pytest_collection_modifyitems(config, items):
+    if not config.getoption('--skip-slow'):
+        return
+
+    skip_slow = pytest.mark.skip(reason='Slow test skipped by --skip-slow.')
+    for item in items:
+        if 'slow' in item.keywords:
+            item.add_marker(skip_slow)
@@ -1,4 +1,4 @@
-from setuptools import Command, find_packages, setup
+from setuptools import Command, setup
 import os
 
 VERSION = '1.0.0'
@@ -39,7 +39,13 @@ distribution = setup(
     long_description="",
     url='http://www.chevah.com',
     namespace_packages=['chevah'],
-    packages=find_packages('.'),
+    # Explicit list, so builds skip find_packages' walk
+    # over the whole working tree.
+    packages=[
+        'chevah',
+        'chevah.github_hooks_server',
+        'chevah.github_hooks_server.tests',
+        ],
     package_data={
         'chevah.github_hooks_server': ['author-aliases.txt'],
         },
@@ -50,13 +56,18 @@ distribution = setup(
         ],
     extras_require={
         'dev': [
-            'mock',
             'nose',
             'pyflakes',
             'pep8',
             'nodeenv==1.6.0',
             ],
     },
+    entry_points={
+        'console_scripts': [
+            'start-chevah-github-hooks='
+            'chevah.github_hooks_server.entrypoint:main',
+            ],
+        },
     cmdclass={
         'publish': PublishCommand,
         },